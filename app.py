@@ -4,10 +4,9 @@ Optimized Version with all features integrated
 """
 
 import streamlit as st
-import google.generativeai as genai
-import os, re, time, json, logging, threading, random
-from datetime import datetime, timedelta
-from typing import Optional, Dict, List, Tuple
+import os, re, time, json, logging, threading, random, hashlib
+from collections import deque, OrderedDict
+from typing import Optional, Dict, Tuple
 from dataclasses import dataclass
 from dotenv import load_dotenv
 
@@ -30,7 +29,11 @@ class AppConfig:
     # Chat Configuration
     MIN_QUERY_LENGTH: int = 2
     MAX_HISTORY: int = 5
+    MAX_CHAT_TURNS: int = 5
+    MAX_RENDERED_MESSAGES: int = 20
     FAQ_THRESHOLD: float = 0.65
+    RESPONSE_CACHE_SIZE: int = 500
+    RESPONSE_CACHE_TTL: int = 7 * 24 * 3600  # seconds
     MAX_RESPONSE_LENGTH: int = 500
     
     # UI Configuration
@@ -39,6 +42,12 @@ class AppConfig:
 
 config = AppConfig()
 
+@st.cache_resource(show_spinner=False)
+def _get_api_key() -> Optional[str]:
+    """Resolve the Gemini API key once per process (.env, secrets, environment)"""
+    load_dotenv()
+    return st.secrets.get("GEMINI_API_KEY") or os.getenv("GEMINI_API_KEY")
+
 # ============================================================================
 # LOGGING SETUP
 # ============================================================================
@@ -61,92 +70,107 @@ class RateLimiter:
     """Thread-safe rate limiter for API calls"""
     def __init__(self, calls_per_minute=5):
         self.calls_per_minute = calls_per_minute
-        self.calls: List[datetime] = []
-        logger.info(f"RateLimiter initialized: {calls_per_minute} calls/min")
+        self.window = 60.0
+        # time.monotonic() timestamps, oldest first
+        self.calls: deque = deque()
+        logger.info("RateLimiter initialized: %d calls/min", calls_per_minute)
+    
+    def _evict(self, now: float) -> None:
+        """Drop calls that have left the window"""
+        cutoff = now - self.window
+        while self.calls and self.calls[0] <= cutoff:
+            self.calls.popleft()
     
     def wait_if_needed(self) -> None:
         """Wait if rate limit is reached"""
-        now = datetime.now()
-        
-        # Remove calls older than 1 minute
-        self.calls = [t for t in self.calls 
-                     if now - t < timedelta(minutes=1)]
+        now = time.monotonic()
+        self._evict(now)
         
-        # If limit reached, wait
+        # If limit reached, wait until the oldest call leaves the window
         if len(self.calls) >= self.calls_per_minute:
-            oldest = self.calls[0]
-            wait_seconds = 60 - (now - oldest).seconds
+            sleep_time = self.calls[0] + self.window - now
             
-            if wait_seconds > 0:
-                # More precise waiting
-                target_time = oldest + timedelta(seconds=60)
-                sleep_time = (target_time - now).total_seconds()
-                
-                if sleep_time > 0:
-                    time.sleep(sleep_time + 0.5)
-                
-                # Reset calls after wait
-                self.calls = []
+            if sleep_time > 0:
+                time.sleep(sleep_time + 0.01)
+            
+            now = time.monotonic()
+            self._evict(now)
         
         # Add current call
         self.calls.append(now)
     
     def get_remaining_calls(self) -> int:
         """Get number of remaining calls in current minute"""
-        now = datetime.now()
-        self.calls = [t for t in self.calls 
-                     if now - t < timedelta(minutes=1)]
+        self._evict(time.monotonic())
         return max(0, self.calls_per_minute - len(self.calls))
 
 # ============================================================================
 # IMPROVED LANGUAGE DETECTION
 # ============================================================================
 
+# Extended Devanagari Unicode ranges
+_DEVANAGARI_RANGES = [
+    (0x0900, 0x097F),  # Devanagari
+    (0x1CD0, 0x1CFF),  # Vedic Extensions
+    (0xA8E0, 0xA8FF),  # Devanagari Extended
+]
+
+# The main block (U+0900-U+097F) is exactly the UTF-8 sequences starting
+# E0 A4 / E0 A5, so detect() counts it with bytes.count. The extension blocks
+# share their lead bytes (E1 B3, EA A3) with other scripts, so they are
+# matched with this class, and only when those lead bytes occur at all
+_DEVANAGARI_EXT_RE = re.compile(
+    '[' + ''.join(f'{chr(start)}-{chr(end)}' for start, end in _DEVANAGARI_RANGES[1:]) + ']'
+)
+
+# Words on lowercased text; digits and non-Latin words count toward the
+# Nepglish ratio's denominator too (same as \b\w+\b)
+_WORD_RE = re.compile(r'\w+')
+
+# Common Nepali words in Romanized form (EXTENDED)
+_NEPALI_INDICATORS = frozenset({
+    # Pronouns and particles
+    'ma', 'cha', 'chha', 'ho', 'huncha', 'hunchha', 'hunxa', 'hunna',
+    'ko', 'lai', 'le', 'ra', 'ni', 'ta', 'po', 
+    
+    # Pronouns
+    'timro', 'mero', 'hamro', 'unko', 'usko', 'tapai', 'timi', 'tapain',
+    'maile', 'taile', 'usle', 'unle',
+    
+    # Question words
+    'kata', 'kaha', 'kina', 'kasari', 'kasko', 'kati', 'kun', 'kaha',
+    'kasto', 'kati', 'khoi', 'ke',
+    
+    # Verbs
+    'bhayo', 'bhayena', 'gareko', 'garena', 'garne', 'garnu', 'garna',
+    'gar', 'garchu', 'garchha', 'garxa', 'hune',
+    'hudaicha', 'hudaina', 'rahecha', 'rahena', 'hunu', 'hunuhuncha',
+    
+    # Common words
+    'ramro', 'naramro', 'thulo', 'sano', 'mitho', 'piro', 'garmi',
+    'jado', 'pani', 'ani', 'tara', 'kinabhane', 'bhanera', 'bhanne',
+    'dai', 'didi', 'bhai', 'bahini', 'aama', 'baba', 'sathi',
+    
+    # Modal/auxiliary
+    'pugcha', 'pugdaina', 'sakcha', 'sakdaina', 'parcha', 'pardaina',
+    'parxa', 'pardaina', 'lagcha', 'lagdaina', 'milcha', 'mildaina',
+    
+    # Time/place
+    'aja', 'bholi', 'hijo', 'asti', 'paxi', 'agadi', 'pachadi',
+    'mathi', 'tala', 'bhitra', 'bahira',
+    
+    # Common phrases
+    'namaste', 'dhanyabad', 'maf', 'kripaya', 'hajur', 'la', 'hoina',
+})
+
 class LanguageDetector:
     """Detect script/language of user input with high accuracy"""
     
-    # Extended Devanagari Unicode ranges
-    DEVANAGARI_RANGES = [
-        (0x0900, 0x097F),  # Devanagari
-        (0x1CD0, 0x1CFF),  # Vedic Extensions
-        (0xA8E0, 0xA8FF),  # Devanagari Extended
-    ]
+    # Extended Devanagari Unicode ranges (see _DEVANAGARI_RANGES)
+    DEVANAGARI_RANGES = _DEVANAGARI_RANGES
     
-    # Common Nepali words in Romanized form (EXTENDED)
-    NEPALI_INDICATORS = {
-        # Pronouns and particles
-        'ma', 'cha', 'chha', 'ho', 'huncha', 'hunchha', 'hunxa', 'hunna',
-        'ko', 'lai', 'le', 'ra', 'ni', 'ta', 'po', 
-        
-        # Pronouns
-        'timro', 'mero', 'hamro', 'unko', 'usko', 'tapai', 'timi', 'tapain',
-        'maile', 'taile', 'usle', 'unle',
-        
-        # Question words
-        'kata', 'kaha', 'kina', 'kasari', 'kasko', 'kati', 'kun', 'kaha',
-        'kasto', 'kati', 'khoi', 'ke',
-        
-        # Verbs
-        'bhayo', 'bhayena', 'gareko', 'garena', 'garne', 'garnu', 'garna',
-        'gar', 'garchu', 'garchha', 'garxa', 'hune',
-        'hudaicha', 'hudaina', 'rahecha', 'rahena', 'hunu', 'hunuhuncha',
-        
-        # Common words
-        'ramro', 'naramro', 'thulo', 'sano', 'mitho', 'piro', 'garmi',
-        'jado', 'pani', 'ani', 'tara', 'kinabhane', 'bhanera', 'bhanne',
-        'dai', 'didi', 'bhai', 'bahini', 'aama', 'baba', 'sathi',
-        
-        # Modal/auxiliary
-        'pugcha', 'pugdaina', 'sakcha', 'sakdaina', 'parcha', 'pardaina',
-        'parxa', 'pardaina', 'lagcha', 'lagdaina', 'milcha', 'mildaina',
-        
-        # Time/place
-        'aja', 'bholi', 'hijo', 'asti', 'paxi', 'agadi', 'pachadi',
-        'mathi', 'tala', 'bhitra', 'bahira',
-        
-        # Common phrases
-        'namaste', 'dhanyabad', 'maf', 'kripaya', 'hajur', 'la', 'hoina',
-    }
+    # Romanized Nepali words (see _NEPALI_INDICATORS)
+    NEPALI_INDICATORS = _NEPALI_INDICATORS
     
     @staticmethod
     def detect(text: str) -> str:
@@ -161,13 +185,13 @@ class LanguageDetector:
             return 'english'
         
         # Count Devanagari characters across all ranges
-        devanagari_chars = sum(
-            1 for c in text 
-            if any(start <= ord(c) <= end for start, end in LanguageDetector.DEVANAGARI_RANGES)
-        )
+        encoded = text.encode('utf-8')
+        devanagari_chars = encoded.count(b'\xe0\xa4') + encoded.count(b'\xe0\xa5')
+        if b'\xe1\xb3' in encoded or b'\xea\xa3' in encoded:
+            devanagari_chars += len(_DEVANAGARI_EXT_RE.findall(text))
         
         # Count total non-space characters
-        total_chars = len(text.replace(' ', ''))
+        total_chars = len(text) - text.count(' ')
         
         if total_chars == 0:
             return 'english'
@@ -176,23 +200,29 @@ class LanguageDetector:
         
         # If 40%+ is Devanagari → Pure Devanagari
         if devanagari_percentage >= 40:
-            logger.debug(f"Detected Devanagari ({devanagari_percentage:.1f}%)")
+            logger.debug("Detected Devanagari (%.1f%%)", devanagari_percentage)
             return 'devanagari'
         
         # Check for Romanized Nepali words
-        words = re.findall(r'\b\w+\b', text.lower())
+        words = _WORD_RE.findall(text.lower())
+        
+        # No words at all (e.g. only punctuation)
+        if not words:
+            logger.debug("Detected English")
+            return 'english'
         
         # Count matches
-        nepali_word_count = sum(1 for word in words if word in LanguageDetector.NEPALI_INDICATORS)
+        indicators = _NEPALI_INDICATORS
+        nepali_word_count = sum(1 for word in words if word in indicators)
         
         # Adjust detection logic
         if len(words) >= 3:
             nepali_ratio = nepali_word_count / len(words)
             if nepali_ratio >= 0.25:  # 25% Nepali words
-                logger.debug(f"Detected Nepglish ({nepali_word_count}/{len(words)} words)")
+                logger.debug("Detected Nepglish (%d/%d words)", nepali_word_count, len(words))
                 return 'nepglish'
         elif nepali_word_count >= 2:
-            logger.debug(f"Detected Nepglish ({nepali_word_count} words)")
+            logger.debug("Detected Nepglish (%d words)", nepali_word_count)
             return 'nepglish'
         
         # Check for mixed script
@@ -207,6 +237,9 @@ class LanguageDetector:
 # MESSAGE VALIDATOR
 # ============================================================================
 
+# Unicode-aware on purpose: collapses non-ASCII spaces in Nepali input too
+_WS_RE = re.compile(r'\s+')
+
 class MessageValidator:
     """Validate and sanitize user messages"""
     
@@ -235,48 +268,26 @@ class MessageValidator:
     def sanitize(message: str) -> str:
         """Remove potentially harmful content"""
         # Remove excessive whitespace
-        message = re.sub(r'\s+', ' ', message)
+        message = _WS_RE.sub(' ', message)
         return message.strip()
 
 # ============================================================================
 # RESPONSE PROCESSOR
 # ============================================================================
 
-class ResponseProcessor:
-    """Process and format AI responses"""
-    
-    @staticmethod
-    def clean(response: str) -> str:
-        """Clean and validate AI response"""
-        # Remove FAQ metadata
-        response = re.sub(r'\[FAQ Match:.*?\]', '', response)
-        response = re.sub(r'\[Similarity:.*?\]', '', response)
-        response = re.sub(r'\[Match.*?\]', '', response)
-        
-        # Remove suspicious URLs
-        suspicious_patterns = [
-            (r'https?://(?:www\.)?youtube\.com/watch\?v=[\w-]+', 
-             '🔍 YouTube ma search gara: '),
-            (r'https?://youtu\.be/[\w-]+', 
-             '🔍 YouTube video search gara: '),
-            (r'https?://[^\s]+', 
-             '🔗 [Link removed - Search instead]')
-        ]
-        
-        for pattern, replacement in suspicious_patterns:
-            response = re.sub(pattern, replacement, response)
-        
-        # Clean excessive newlines
-        response = re.sub(r'\n{3,}', '\n\n', response)
-        
-        return response.strip()
-    
-    @staticmethod
-    def format_error(error: Exception, script: str) -> str:
-        """Format error message based on language"""
-        error_messages = {
-            'rate_limit': {
-                'devanagari': """**⚠️ Request Limit पुग्यो**
+# Patterns with ASCII-only semantics skip Unicode class lookups on Nepali text.
+# _URL_RE stays Unicode-aware so a URL still ends at non-ASCII whitespace.
+_FAQ_META_RE = re.compile(r'\[(?:FAQ Match:|Similarity:|Match)[^\]\n]*\]', re.ASCII)
+_YT_WATCH_RE = re.compile(r'https?://(?:www\.)?youtube\.com/watch\?v=[\w-]+', re.ASCII)
+_YT_SHORT_RE = re.compile(r'https?://youtu\.be/[\w-]+', re.ASCII)
+_URL_RE = re.compile(r'https?://[^\s]+')
+_URL_TRAILING = ')]}>,.;:!?\'"'
+_NL_RE = re.compile(r'\n{3,}', re.ASCII)
+
+# Localized error messages; 'generic' entries take the error text via %s
+_ERROR_TEMPLATES: Dict[str, Dict[str, str]] = {
+    'rate_limit': {
+        'devanagari': """**⚠️ Request Limit पुग्यो**
 
 कृपया १-२ मिनेट पर्खनुहोस्। Free tier मा limited requests छन्।
 
@@ -284,7 +295,7 @@ class ResponseProcessor:
 • छोटो प्रश्न सोध्नुहोस्
 • केही मिनेट पछि पुनः प्रयास गर्नुहोस्
 • एकै समयमा धेरै प्रश्न नसोध्नुहोस्""",
-                'nepglish': """**⚠️ Request Limit Reached**
+        'nepglish': """**⚠️ Request Limit Reached**
 
 Kripaya 1-2 minute wait garnus. Free tier ma limited requests chan.
 
@@ -292,7 +303,7 @@ Kripaya 1-2 minute wait garnus. Free tier ma limited requests chan.
 • Ask concise questions
 • Try again after a few minutes
 • Don't send multiple questions at once""",
-                'english': """**⚠️ Request Limit Reached**
+        'english': """**⚠️ Request Limit Reached**
 
 Please wait 1-2 minutes. Free tier has limited requests.
 
@@ -300,20 +311,62 @@ Please wait 1-2 minutes. Free tier has limited requests.
 • Ask concise questions
 • Try again after a few minutes
 • Don't send multiple questions at once"""
-            },
-            'timeout': {
-                'devanagari': "**⏱️ Response Timeout**\n\nAI लाई समय लाग्यो। छोटो message try गर्नुहोस् वा केही समय पछि फेरि सोध्नुहोस्।",
-                'nepglish': "**⏱️ Response Timeout**\n\nAI lai time lagyo. Try a shorter message or ask again later.",
-                'english': "**⏱️ Response Timeout**\n\nAI took too long to respond. Try a shorter message or ask again later."
-            },
-            'generic': {
-                'devanagari': f"**❌ त्रुटि भयो**\n\nकृपया फेरि प्रयास गर्नुहोस्।\n\nError: {str(error)[:100]}",
-                'nepglish': f"**❌ Error Bhayo**\n\nKripaya feri try garnus.\n\nError: {str(error)[:100]}",
-                'english': f"**❌ An Error Occurred**\n\nPlease try again.\n\nError: {str(error)[:100]}"
-            }
-        }
+    },
+    'timeout': {
+        'devanagari': "**⏱️ Response Timeout**\n\nAI लाई समय लाग्यो। छोटो message try गर्नुहोस् वा केही समय पछि फेरि सोध्नुहोस्।",
+        'nepglish': "**⏱️ Response Timeout**\n\nAI lai time lagyo. Try a shorter message or ask again later.",
+        'english': "**⏱️ Response Timeout**\n\nAI took too long to respond. Try a shorter message or ask again later."
+    },
+    'generic': {
+        'devanagari': "**❌ त्रुटि भयो**\n\nकृपया फेरि प्रयास गर्नुहोस्।\n\nError: %s",
+        'nepglish': "**❌ Error Bhayo**\n\nKripaya feri try garnus.\n\nError: %s",
+        'english': "**❌ An Error Occurred**\n\nPlease try again.\n\nError: %s"
+    }
+}
+
+class ResponseProcessor:
+    """Process and format AI responses"""
+    
+    # YouTube URLs get a search hint; any other URL is removed
+    SUSPICIOUS_PATTERNS = [
+        (_YT_WATCH_RE, '🔍 YouTube ma search gara: '),
+        (_YT_SHORT_RE, '🔍 YouTube video search gara: '),
+    ]
+    
+    @staticmethod
+    def _replace_url(match: re.Match) -> str:
+        """Pick the replacement for one URL found by _URL_RE"""
+        # Closing brackets and sentence punctuation belong to the text around the URL
+        url = match.group(0).rstrip(_URL_TRAILING)
+        tail = match.group(0)[len(url):]
+        for pattern, replacement in ResponseProcessor.SUSPICIOUS_PATTERNS:
+            if pattern.match(url):
+                return replacement + tail
+        return '🔗 [Link removed - Search instead]' + tail
+    
+    @staticmethod
+    def clean(response: str) -> str:
+        """Clean and validate AI response"""
+        # Substring checks skip each regex pass when it cannot match
+        # Remove FAQ metadata
+        if '[' in response:
+            response = _FAQ_META_RE.sub('', response)
         
-        error_str = str(error).lower()
+        # Remove suspicious URLs in one scan, classifying each match
+        if 'http' in response:
+            response = _URL_RE.sub(ResponseProcessor._replace_url, response)
+        
+        # Clean excessive newlines
+        if '\n\n\n' in response:
+            response = _NL_RE.sub('\n\n', response)
+        
+        return response.strip()
+    
+    @staticmethod
+    def format_error(error: Exception, script: str) -> str:
+        """Format error message based on language"""
+        error_text = str(error)
+        error_str = error_text.lower()
         
         if 'quota' in error_str or '429' in error_str:
             error_type = 'rate_limit'
@@ -322,7 +375,13 @@ Please wait 1-2 minutes. Free tier has limited requests.
         else:
             error_type = 'generic'
         
-        return error_messages[error_type].get(script, error_messages[error_type]['english'])
+        templates = _ERROR_TEMPLATES[error_type]
+        template = templates.get(script, templates['english'])
+        
+        # Only the generic messages embed the error text
+        if error_type == 'generic':
+            return template % error_text[:100]
+        return template
 
 # ============================================================================
 # FAQ HANDLER (SIMPLIFIED)
@@ -347,6 +406,29 @@ class FAQHandler:
         }
     }
     
+    @staticmethod
+    @st.cache_resource(show_spinner=False)
+    def _index(language: str) -> Tuple:
+        """
+        Build the matching index for one language (once per process)
+        
+        Returns:
+            (question_pattern, question_positions, questions, answers)
+        """
+        questions = [q.lower() for q in FAQHandler.FAQ_DATA[language]]
+        answers = list(FAQHandler.FAQ_DATA[language].values())
+        
+        # Lookahead alternation in FAQ order: at every offset the first
+        # alternative that matches is the lowest-index question starting there
+        question_pattern = re.compile(
+            '(?=(' + '|'.join(re.escape(q) for q in questions) + '))'
+        )
+        question_positions: Dict[str, int] = {}
+        for i, q in enumerate(questions):
+            question_positions.setdefault(q, i)
+        
+        return question_pattern, question_positions, questions, answers
+    
     @staticmethod
     def get_answer(query: str, language: str = 'en', threshold: float = 0.65) -> Optional[str]:
         """Simple FAQ matching"""
@@ -354,18 +436,68 @@ class FAQHandler:
             language = 'en'
         
         query_lower = query.lower().strip()
-        
-        # Simple keyword matching
-        for question, answer in FAQHandler.FAQ_DATA[language].items():
-            question_lower = question.lower()
-            
-            # Check for direct match or contains
-            if (query_lower == question_lower or 
-                query_lower in question_lower or 
-                question_lower in query_lower):
-                return answer
-        
-        return None
+        question_pattern, question_positions, questions, answers = FAQHandler._index(language)
+        
+        # FAQ question contained in the query (covers direct match)
+        best = None
+        for match in question_pattern.finditer(query_lower):
+            i = question_positions[match.group(1)]
+            if best is None or i < best:
+                best = i
+        
+        # Query contained in an FAQ question; only earlier questions can win
+        for i, q in enumerate(questions[:best]):
+            if query_lower in q:
+                best = i
+                break
+        
+        return answers[best] if best is not None else None
+
+# ============================================================================
+# RESPONSE CACHE
+# ============================================================================
+
+class ResponseCache:
+    """Shared cache of AI replies, keyed by conversation history and normalized text"""
+    
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()  # key -> (stored_at, raw, response)
+        self._lock = threading.Lock()  # shared by all sessions
+    
+    @staticmethod
+    def _key(query: str, script: str, history_key: str) -> Tuple[str, str, str]:
+        """Fold case, spacing and trailing punctuation so rephrasings collide"""
+        return history_key, script, ' '.join(query.casefold().split()).rstrip('?!.। ')
+    
+    def get(self, query: str, script: str, history_key: str = '') -> Optional[Tuple[str, str]]:
+        """Return (raw, cleaned) reply, or None if missing or expired"""
+        key = self._key(query, script, history_key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, raw, response = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return raw, response
+    
+    def put(self, query: str, script: str, raw: str, response: str, history_key: str = ''):
+        """Store a reply, evicting the least recently used beyond max_size"""
+        key = self._key(query, script, history_key)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), raw, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+@st.cache_resource(show_spinner=False)
+def _get_response_cache() -> ResponseCache:
+    """One cache per server process, surviving reruns"""
+    return ResponseCache(config.RESPONSE_CACHE_SIZE, config.RESPONSE_CACHE_TTL)
 
 # ============================================================================
 # IMPROVED SYSTEM PROMPT
@@ -420,15 +552,22 @@ Education expensive cha. Dherai lai afford garna garo huncha.
 # AI CHAT MANAGER
 # ============================================================================
 
+@st.cache_resource(show_spinner=False)
+def _get_model(api_key: str, model_name: str, system_prompt: str):
+    """Configure the SDK and build the model once per process"""
+    # Imported here so the SDK's gRPC/protobuf stack loads off the first paint
+    import google.generativeai as genai
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel(
+        model_name,
+        system_instruction=system_prompt
+    )
+
 class AIChatManager:
     """Manage AI chat interactions"""
     
     def __init__(self, api_key: str):
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel(
-            config.MODEL_NAME,
-            system_instruction=SYSTEM_PROMPT
-        )
+        self.model = _get_model(api_key, config.MODEL_NAME, SYSTEM_PROMPT)
         self.chat = None
         logger.info("AI Chat Manager initialized")
     
@@ -437,45 +576,140 @@ class AIChatManager:
         self.chat = self.model.start_chat(history=[])
         logger.info("New chat session started")
     
-    def send_message(self, message: str, script: str) -> str:
+    def _trim_history(self):
+        """Keep only the last MAX_CHAT_TURNS turns so each request stays small"""
+        # One turn = user content + model content
+        max_contents = config.MAX_CHAT_TURNS * 2
+        history = self.chat.history
+        if len(history) > max_contents:
+            self.chat = self.model.start_chat(history=history[-max_contents:])
+            logger.debug("Chat history trimmed to %d contents", max_contents)
+    
+    def history_key(self) -> str:
+        """Digest of the conversation so far ('' for a fresh chat)"""
+        if not self.chat:
+            return ''
+        try:
+            history = self.chat.history
+        except Exception as e:
+            # An unfinished stream poisons the session; drop that turn
+            logger.warning("Chat history unreadable, rewinding: %s", e)
+            try:
+                self.chat.rewind()
+                history = self.chat.history
+            except Exception:
+                self.start_chat()
+                return ''
+        if not history:
+            return ''
+        digest = hashlib.blake2b(digest_size=16)
+        for content in history:
+            # Joined so a streamed multi-part reply hashes like a single part;
+            # non-text parts contribute nothing
+            text = ''.join(getattr(part, 'text', '') for part in content.parts)
+            digest.update(b'\x01' + content.role.encode() + b'\x00' + text.encode('utf-8'))
+        return digest.hexdigest()
+    
+    def record_exchange(self, message: str, raw_response: str):
+        """
+        Append a reply served without an API call to the chat history
+        
+        Takes the raw model text, as a live call would leave it, so later
+        history digests match those of the conversation it was cached from.
+        """
+        self._ensure_chat()
+        self.chat = self.model.start_chat(history=list(self.chat.history) + [
+            {"role": "user", "parts": [message]},
+            {"role": "model", "parts": [raw_response]},
+        ])
+        self._trim_history()
+    
+    def _ensure_chat(self):
+        """Start a chat session if none is active"""
+        if not self.chat:
+            self.start_chat()
+    
+    def send_message(self, message: str) -> str:
         """
         Send message to AI and get response
         
         Args:
             message: User message
-            script: Detected script (devanagari/nepglish/english)
             
         Returns:
-            AI response text
+            Raw AI response text; run ResponseProcessor.clean before display
         """
-        if not self.chat:
-            self.start_chat()
+        self._ensure_chat()
         
-        # Prepare prompt with language instruction
-        instructions = {
-            'devanagari': "[USER IS WRITING IN DEVANAGARI SCRIPT - YOU MUST RESPOND 100% IN DEVANAGARI]",
-            'nepglish': "[USER IS WRITING IN ROMANIZED NEPALI (NEPGLISH) - YOU MUST RESPOND IN NEPGLISH]",
-            'english': "[USER IS WRITING IN ENGLISH - YOU MUST RESPOND IN ENGLISH]"
-        }
+        try:
+            response = self.chat.send_message(
+                message,
+                request_options={"timeout": config.API_TIMEOUT}
+            )
+            
+            self._trim_history()
+            return response.text
+            
+        except Exception as e:
+            logger.error("AI chat error: %s", e, exc_info=True)
+            raise Exception(f"Failed to get AI response: {str(e)[:100]}")
+    
+    def stream_message(self, message: str):
+        """
+        Send message to AI and yield the response text as it arrives
         
-        tagged_message = f"{instructions[script]}\n\nUser: {message}"
+        Chunks are raw model output; run ResponseProcessor.clean on the
+        joined text once the stream is drained.
+        
+        Args:
+            message: User message
+            
+        Yields:
+            Response text chunks
+        """
+        self._ensure_chat()
+        
+        # A stream that fails or is blocked partway leaves the ChatSession
+        # broken (every history read raises), so keep what to restore
+        snapshot = list(self.chat.history)
         
         try:
             response = self.chat.send_message(
-                tagged_message,
+                message,
+                stream=True,
                 request_options={"timeout": config.API_TIMEOUT}
             )
             
-            return ResponseProcessor.clean(response.text)
+            for chunk in response:
+                yield chunk.text
+            
+            self._trim_history()
             
         except Exception as e:
-            logger.error(f"AI chat error: {e}", exc_info=True)
+            self.chat = self.model.start_chat(history=snapshot)
+            logger.error("AI chat error: %s", e, exc_info=True)
             raise Exception(f"Failed to get AI response: {str(e)[:100]}")
 
 # ============================================================================
 # SESSION STATE MANAGER
 # ============================================================================
 
+# Prompts offered as suggestion cards, sampled 6 at a time
+_SUGGESTION_POOL: Tuple[str, ...] = (
+    "What skills are most useful for students today?",
+    "How can I improve my focus while studying?",
+    "What are common career mistakes?",
+    "How to prepare for SEE exam?",
+    "Bachelor pachi career choose kasari garne?",
+    "Nepal ma students ko main struggle?",
+    "Time management kasari improve garne?",
+    "IOE entrance preparation?",
+    "विद्यार्थीहरूले सामना गर्ने समस्या?",
+    "आत्मविश्वास कसरी बढाउने?",
+    "करियर छनोट गर्दा ध्यान दिनुपर्ने?",
+    "पढाइमा मन कसरी लाउने?",
+)
+
 class SessionStateManager:
     """Manage Streamlit session state"""
     
@@ -484,35 +718,55 @@ class SessionStateManager:
         """Initialize all session state variables"""
         defaults = {
             "messages": [],
-            "rate_limiter": RateLimiter(config.API_CALLS_PER_MINUTE),
+            "rate_limiter": None,  # created on first AI call
             "chat_manager": None,
-            "query_history": [],
+            "query_history": deque(maxlen=config.MAX_HISTORY),
+            "query_history_labels": deque(maxlen=config.MAX_HISTORY),
             "suggestions": [],
+            "user_msg_count": 0,
+            "cache_hits": 0,
             "initialized": False
         }
         
         for key, default_value in defaults.items():
-            if key not in st.session_state:
-                st.session_state[key] = default_value
+            st.session_state.setdefault(key, default_value)
         
         if not st.session_state.initialized:
+            SessionStateManager.generate_suggestions()
             logger.info("Session state initialized")
             st.session_state.initialized = True
     
+    @staticmethod
+    def get_rate_limiter() -> RateLimiter:
+        """Return the session rate limiter, creating it on first use"""
+        if st.session_state.rate_limiter is None:
+            st.session_state.rate_limiter = RateLimiter(config.API_CALLS_PER_MINUTE)
+        return st.session_state.rate_limiter
+    
     @staticmethod
     def add_to_history(query: str):
         """Add query to history"""
         if (query not in st.session_state.query_history and 
             len(query.strip()) > config.MIN_QUERY_LENGTH and
             not query.startswith('/')):
-            st.session_state.query_history.insert(0, query)
-            st.session_state.query_history = st.session_state.query_history[:config.MAX_HISTORY]
+            label = query[:45] + "..." if len(query) > 45 else query
+            # Bounded deques drop the oldest entry themselves
+            st.session_state.query_history.appendleft(query)
+            st.session_state.query_history_labels.appendleft(label)
+    
+    @staticmethod
+    def queue_prompt(prompt: str):
+        """Button callback: process prompt in the rerun the click triggers"""
+        st.session_state.pending_prompt = prompt
     
     @staticmethod
     def clear_chat():
         """Clear chat history"""
         st.session_state.messages = []
-        st.session_state.query_history = []
+        st.session_state.user_msg_count = 0
+        st.session_state.cache_hits = 0
+        st.session_state.query_history.clear()
+        st.session_state.query_history_labels.clear()
         if st.session_state.chat_manager:
             st.session_state.chat_manager.start_chat()
         logger.info("Chat history cleared")
@@ -520,28 +774,47 @@ class SessionStateManager:
     @staticmethod
     def generate_suggestions():
         """Generate new suggestion prompts"""
-        suggestion_pool = [
-            "What skills are most useful for students today?",
-            "How can I improve my focus while studying?",
-            "What are common career mistakes?",
-            "How to prepare for SEE exam?",
-            "Bachelor pachi career choose kasari garne?",
-            "Nepal ma students ko main struggle?",
-            "Time management kasari improve garne?",
-            "IOE entrance preparation?",
-            "विद्यार्थीहरूले सामना गर्ने समस्या?",
-            "आत्मविश्वास कसरी बढाउने?",
-            "करियर छनोट गर्दा ध्यान दिनुपर्ने?",
-            "पढाइमा मन कसरी लाउने?",
-        ]
-        st.session_state.suggestions = random.sample(suggestion_pool, 6)
+        st.session_state.suggestions = random.sample(_SUGGESTION_POOL, 6)
 
 # ============================================================================
 # MESSAGE PROCESSOR
 # ============================================================================
 
-def process_user_message(user_input: str):
-    """Process user message and generate response"""
+def throttle_stream(chunks, min_interval: float = 0.05, min_chars: int = 8):
+    """
+    Re-chunk a text stream so the UI redraws at most ~20 times per second
+    
+    Args:
+        chunks: Iterable of text chunks
+        min_interval: Minimum seconds between yields
+        min_chars: Minimum buffered characters before yielding
+        
+    Yields:
+        Batched text chunks (the remainder is flushed at the end)
+    """
+    buffer = ''
+    last_flush = time.monotonic()
+    
+    for chunk in chunks:
+        buffer += chunk
+        now = time.monotonic()
+        if len(buffer) >= min_chars and now - last_flush >= min_interval:
+            yield buffer
+            buffer = ''
+            last_flush = now
+    
+    if buffer:
+        yield buffer
+
+def process_user_message(user_input: str, stream: bool = False):
+    """
+    Process user message and generate response
+    
+    Args:
+        user_input: Raw user message
+        stream: Render the new turn in the main chat area as it is produced
+    """
+    script = 'english'
     try:
         # Validate input
         is_valid, error_msg = MessageValidator.validate(user_input)
@@ -552,6 +825,14 @@ def process_user_message(user_input: str):
         # Sanitize input
         user_input = MessageValidator.sanitize(user_input)
         
+        # Detect script once; every branch below reuses it. Commands are
+        # classified by their argument, not the command word
+        detect_text = user_input
+        if user_input.startswith('/'):
+            detect_text = user_input.partition(' ')[2]
+        script = LanguageDetector.detect(detect_text)
+        language = 'en' if script == 'english' else 'np'
+        
         # Add to history
         SessionStateManager.add_to_history(user_input)
         
@@ -560,12 +841,14 @@ def process_user_message(user_input: str):
             "role": "user",
             "content": user_input
         })
+        st.session_state.user_msg_count += 1
+        if stream:
+            render_message(st.session_state.messages[-1])
         
         # Check for special commands
         if user_input.startswith('/summarize') or user_input.startswith('/summary'):
             text_to_summarize = user_input.replace('/summarize', '').replace('/summary', '').strip()
             if not text_to_summarize:
-                script = LanguageDetector.detect(user_input)
                 if script == 'devanagari':
                     return "**📝 Summarize Command**\n\nकृपया summarize गर्नको लागि text प्रदान गर्नुहोस्।"
                 else:
@@ -573,10 +856,6 @@ def process_user_message(user_input: str):
             user_input = f"Please summarize this text in the same language/script: {text_to_summarize}"
         
         # Check FAQ first (instant response, no API call)
-        script = LanguageDetector.detect(user_input)
-        language_map = {'devanagari': 'np', 'nepglish': 'np', 'english': 'en'}
-        language = language_map.get(script, 'en')
-        
         faq_answer = FAQHandler.get_answer(user_input, language, config.FAQ_THRESHOLD)
         if faq_answer:
             if script == 'devanagari':
@@ -588,13 +867,46 @@ def process_user_message(user_input: str):
                 "role": "assistant",
                 "content": response
             })
+            if stream:
+                render_message(st.session_state.messages[-1])
+            return
+        
+        # Same question after the same conversation (e.g. an opening
+        # suggestion) reuses the earlier reply without an API call
+        chat_manager = st.session_state.chat_manager
+        history_key = chat_manager.history_key()
+        cached = _get_response_cache().get(user_input, script, history_key)
+        if cached:
+            raw_response, response = cached
+            chat_manager.record_exchange(user_input, raw_response)
+            st.session_state.cache_hits += 1
+            st.session_state.messages.append({
+                "role": "assistant",
+                "content": response
+            })
+            if stream:
+                render_message(st.session_state.messages[-1])
             return
         
         # Apply rate limiting
-        st.session_state.rate_limiter.wait_if_needed()
+        SessionStateManager.get_rate_limiter().wait_if_needed()
         
         # Get AI response
-        response = st.session_state.chat_manager.send_message(user_input, script)
+        if stream:
+            with st.chat_message("assistant"):
+                # Stream the raw text, then swap in the cleaned reply
+                placeholder = st.empty()
+                raw_response = placeholder.write_stream(throttle_stream(
+                    chat_manager.stream_message(user_input)
+                ))
+                response = ResponseProcessor.clean(raw_response)
+                placeholder.markdown(response)
+        else:
+            raw_response = chat_manager.send_message(user_input)
+            response = ResponseProcessor.clean(raw_response)
+        
+        if response:
+            _get_response_cache().put(user_input, script, raw_response, response, history_key)
         
         # Add AI response to chat
         st.session_state.messages.append({
@@ -602,329 +914,344 @@ def process_user_message(user_input: str):
             "content": response
         })
         
-        logger.info(f"Message processed successfully in {script}")
+        logger.info("Message processed successfully in %s", script)
         
     except Exception as e:
-        logger.error(f"Error processing message: {e}", exc_info=True)
-        script = LanguageDetector.detect(user_input)
+        logger.error("Error processing message: %s", e, exc_info=True)
         error_msg = ResponseProcessor.format_error(e, script)
         
         st.session_state.messages.append({
             "role": "assistant",
             "content": error_msg
         })
+        if stream:
+            render_message(st.session_state.messages[-1])
 
 # ============================================================================
 # UI COMPONENTS
 # ============================================================================
 
+# Static stylesheet, built once at import
+_CSS_HTML = """
+<style>
+/* ============= ROOT VARIABLES ============= */
+:root {
+    --primary: #0891b2;
+    --primary-dark: #0e7490;
+    --accent: #3b82f6;
+    --success: #10b981;
+    --warning: #f59e0b;
+    --danger: #ef4444;
+    --bg: #ffffff;
+    --bg-secondary: #f8fafc;
+    --bg-tertiary: #f1f5f9;
+    --text: #1e293b;
+    --text-secondary: #64748b;
+    --border: #e2e8f0;
+    --shadow: 0 1px 3px rgba(0,0,0,0.08);
+    --shadow-lg: 0 10px 25px rgba(0,0,0,0.1);
+}
+
+[data-theme="dark"] {
+    --bg: #0f172a;
+    --bg-secondary: #1e293b;
+    --bg-tertiary: #334155;
+    --text: #f1f5f9;
+    --text-secondary: #94a3b8;
+    --border: #334155;
+    --shadow: 0 1px 3px rgba(0,0,0,0.3);
+    --shadow-lg: 0 10px 25px rgba(0,0,0,0.4);
+}
+
+/* ============= GLOBAL STYLES ============= */
+* {
+    font-family: 'Inter', -apple-system, BlinkMacSystemFont, sans-serif;
+}
+
+#MainMenu, header, footer {visibility: hidden;}
+
+.main .block-container {
+    max-width: 1100px;
+    padding: 2rem 2rem calc(8rem + 100px);
+}
+
+/* ============= HEADER ============= */
+.app-header {
+    text-align: center;
+    padding: 2rem 0 3rem;
+    animation: fadeInDown 0.5s ease-out;
+}
+
+.app-header h1 {
+    font-size: 3rem;
+    font-weight: 800;
+    background: linear-gradient(135deg, var(--primary) 0%, var(--accent) 100%);
+    -webkit-background-clip: text;
+    -webkit-text-fill-color: transparent;
+    margin-bottom: 0.5rem;
+}
+
+.app-subtitle {
+    color: var(--text-secondary);
+    font-size: 1.125rem;
+    font-weight: 500;
+    margin-bottom: 1.5rem;
+}
+
+.lang-badges {
+    display: flex;
+    gap: 0.75rem;
+    justify-content: center;
+    flex-wrap: wrap;
+}
+
+.lang-badge {
+    background: var(--bg-secondary);
+    border: 2px solid var(--border);
+    padding: 0.5rem 1.25rem;
+    border-radius: 50px;
+    font-size: 0.875rem;
+    color: var(--text-secondary);
+    font-weight: 600;
+    transition: all 0.3s;
+}
+
+.lang-badge:hover {
+    border-color: var(--primary);
+    color: var(--primary);
+    transform: translateY(-2px);
+    box-shadow: var(--shadow-lg);
+}
+
+/* ============= CHAT MESSAGES ============= */
+.stChatMessage {
+    padding: 1.5rem;
+    border-radius: 16px;
+    margin-bottom: 1.25rem;
+    box-shadow: var(--shadow);
+    animation: fadeInUp 0.3s ease-out;
+}
+
+[data-testid="stChatMessageUser"] {
+    background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
+    color: white;
+}
+
+[data-testid="stChatMessageUser"] p {
+    color: white !important;
+}
+
+[data-testid="stChatMessageAssistant"] {
+    background: var(--bg-secondary);
+    border-left: 4px solid var(--primary);
+}
+
+.stChatMessage p {
+    color: var(--text);
+    line-height: 1.7;
+    margin-bottom: 0.5rem;
+}
+
+/* ============= CHAT INPUT ============= */
+.stChatInput {
+    position: fixed;
+    bottom: 0;
+    left: 21rem;
+    right: 0;
+    background: var(--bg);
+    padding: 1.5rem 2rem;
+    border-top: 1px solid var(--border);
+    box-shadow: 0 -4px 20px rgba(0,0,0,0.08);
+    z-index: 999;
+    backdrop-filter: blur(10px);
+}
+
+.stChatInput textarea {
+    border-radius: 50px !important;
+    border: 2px solid var(--border) !important;
+    padding: 1rem 1.5rem !important;
+    background: var(--bg-secondary) !important;
+    color: var(--text) !important;
+    font-size: 0.95rem !important;
+    transition: all 0.2s !important;
+}
+
+.stChatInput textarea:focus {
+    border-color: var(--primary) !important;
+    box-shadow: 0 0 0 3px rgba(8, 145, 178, 0.1) !important;
+}
+
+.stChatInput textarea::placeholder {
+    color: var(--text-secondary) !important;
+}
+
+/* ============= SIDEBAR ============= */
+[data-testid="stSidebar"] {
+    background: var(--bg-secondary);
+    border-right: 1px solid var(--border);
+    width: 21rem;
+}
+
+[data-testid="stSidebar"] .sidebar-content {
+    padding: 1.5rem;
+}
+
+[data-testid="stSidebar"] h2 {
+    color: var(--primary) !important;
+    font-weight: 800 !important;
+    font-size: 1.5rem !important;
+    margin-bottom: 0.5rem !important;
+}
+
+/* Sidebar buttons */
+[data-testid="stSidebar"] .stButton button {
+    width: 100%;
+    border-radius: 12px;
+    padding: 0.875rem 1rem;
+    margin-bottom: 0.5rem;
+    border: 2px solid var(--border);
+    background: var(--bg);
+    color: var(--text);
+    text-align: left;
+    font-weight: 500;
+    transition: all 0.2s;
+}
+
+[data-testid="stSidebar"] .stButton button:hover {
+    border-color: var(--primary);
+    transform: translateX(4px);
+    box-shadow: var(--shadow);
+}
+
+/* Clear button */
+[data-testid="stSidebar"] .stButton button[kind="primary"] {
+    background: var(--danger);
+    color: white;
+    border: none;
+    font-weight: 600;
+}
+
+[data-testid="stSidebar"] .stButton button[kind="primary"]:hover {
+    background: #dc2626;
+    transform: scale(1.02);
+}
+
+/* ============= TABS ============= */
+.stTabs [data-baseweb="tab-list"] {
+    gap: 0.25rem;
+    background: var(--bg-tertiary);
+    border-radius: 12px;
+    padding: 0.25rem;
+}
+
+.stTabs [data-baseweb="tab"] {
+    border-radius: 8px;
+    padding: 0.75rem 1.25rem;
+    color: var(--text-secondary);
+    font-weight: 600;
+    transition: all 0.2s;
+}
+
+.stTabs [aria-selected="true"] {
+    background: var(--primary);
+    color: white;
+}
+
+/* ============= SUGGESTION CARDS ============= */
+.suggestion-grid {
+    display: grid;
+    grid-template-columns: repeat(auto-fit, minmax(280px, 1fr));
+    gap: 1rem;
+    margin: 2rem 0;
+}
+
+.main .stButton button {
+    background: var(--bg-secondary);
+    border: 2px solid var(--border);
+    border-radius: 16px;
+    padding: 1.5rem;
+    color: var(--text);
+    text-align: left;
+    min-height: 100px;
+    transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
+    font-weight: 500;
+    line-height: 1.5;
+}
+
+.main .stButton button:hover {
+    border-color: var(--primary);
+    transform: translateY(-4px);
+    box-shadow: var(--shadow-lg);
+    background: var(--primary);
+    color: white;
+}
+
+/* Refresh button */
+.main .stButton button[kind="secondary"] {
+    min-height: auto;
+    color: var(--primary);
+    font-weight: 600;
+    border-color: var(--primary);
+}
+
+.main .stButton button[kind="secondary"]:hover {
+    background: var(--primary);
+    color: white;
+}
+
+/* ============= ANIMATIONS ============= */
+@keyframes fadeInDown {
+    from { opacity: 0; transform: translateY(-20px); }
+    to { opacity: 1; transform: translateY(0); }
+}
+
+@keyframes fadeInUp {
+    from { opacity: 0; transform: translateY(20px); }
+    to { opacity: 1; transform: translateY(0); }
+}
+
+/* ============= RESPONSIVE ============= */
+@media (max-width: 768px) {
+    .main .block-container {
+        padding: 1rem 1rem calc(6rem + 100px);
+    }
+    
+    .stChatInput {
+        left: 0;
+        padding: 1rem;
+    }
+    
+    .app-header h1 {
+        font-size: 2.25rem;
+    }
+    
+    .suggestion-grid {
+        grid-template-columns: 1fr;
+    }
+}
+</style>
+"""
+
+def _minify_css(css: str) -> str:
+    """Strip comments and redundant whitespace from a stylesheet"""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{}:;,])\s*', r'\1', css)
+    return css.strip()
+
+@st.cache_data(show_spinner=False)
+def _css_html() -> str:
+    """Minified stylesheet, computed once per process rather than per rerun"""
+    return _minify_css(_CSS_HTML)
+
 def inject_custom_css():
     """Inject professional custom CSS"""
-    st.markdown(f"""
-    <style>
-    /* ============= ROOT VARIABLES ============= */
-    :root {{
-        --primary: #0891b2;
-        --primary-dark: #0e7490;
-        --accent: #3b82f6;
-        --success: #10b981;
-        --warning: #f59e0b;
-        --danger: #ef4444;
-        --bg: #ffffff;
-        --bg-secondary: #f8fafc;
-        --bg-tertiary: #f1f5f9;
-        --text: #1e293b;
-        --text-secondary: #64748b;
-        --border: #e2e8f0;
-        --shadow: 0 1px 3px rgba(0,0,0,0.08);
-        --shadow-lg: 0 10px 25px rgba(0,0,0,0.1);
-    }}
-    
-    [data-theme="dark"] {{
-        --bg: #0f172a;
-        --bg-secondary: #1e293b;
-        --bg-tertiary: #334155;
-        --text: #f1f5f9;
-        --text-secondary: #94a3b8;
-        --border: #334155;
-        --shadow: 0 1px 3px rgba(0,0,0,0.3);
-        --shadow-lg: 0 10px 25px rgba(0,0,0,0.4);
-    }}
-    
-    /* ============= GLOBAL STYLES ============= */
-    * {{
-        font-family: 'Inter', -apple-system, BlinkMacSystemFont, sans-serif;
-    }}
-    
-    #MainMenu, header, footer {{visibility: hidden;}}
-    
-    .main .block-container {{
-        max-width: 1100px;
-        padding: 2rem 2rem 8rem;
-    }}
-    
-    /* ============= HEADER ============= */
-    .app-header {{
-        text-align: center;
-        padding: 2rem 0 3rem;
-        animation: fadeInDown 0.5s ease-out;
-    }}
-    
-    .app-header h1 {{
-        font-size: 3rem;
-        font-weight: 800;
-        background: linear-gradient(135deg, var(--primary) 0%, var(--accent) 100%);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        margin-bottom: 0.5rem;
-    }}
-    
-    .app-subtitle {{
-        color: var(--text-secondary);
-        font-size: 1.125rem;
-        font-weight: 500;
-        margin-bottom: 1.5rem;
-    }}
-    
-    .lang-badges {{
-        display: flex;
-        gap: 0.75rem;
-        justify-content: center;
-        flex-wrap: wrap;
-    }}
-    
-    .lang-badge {{
-        background: var(--bg-secondary);
-        border: 2px solid var(--border);
-        padding: 0.5rem 1.25rem;
-        border-radius: 50px;
-        font-size: 0.875rem;
-        color: var(--text-secondary);
-        font-weight: 600;
-        transition: all 0.3s;
-    }}
-    
-    .lang-badge:hover {{
-        border-color: var(--primary);
-        color: var(--primary);
-        transform: translateY(-2px);
-        box-shadow: var(--shadow-lg);
-    }}
-    
-    /* ============= CHAT MESSAGES ============= */
-    .stChatMessage {{
-        padding: 1.5rem;
-        border-radius: 16px;
-        margin-bottom: 1.25rem;
-        box-shadow: var(--shadow);
-        animation: fadeInUp 0.3s ease-out;
-    }}
-    
-    [data-testid="stChatMessageUser"] {{
-        background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-        color: white;
-    }}
-    
-    [data-testid="stChatMessageUser"] p {{
-        color: white !important;
-    }}
-    
-    [data-testid="stChatMessageAssistant"] {{
-        background: var(--bg-secondary);
-        border-left: 4px solid var(--primary);
-    }}
-    
-    .stChatMessage p {{
-        color: var(--text);
-        line-height: 1.7;
-        margin-bottom: 0.5rem;
-    }}
-    
-    /* ============= CHAT INPUT ============= */
-    .stChatInput {{
-        position: fixed;
-        bottom: 0;
-        left: 21rem;
-        right: 0;
-        background: var(--bg);
-        padding: 1.5rem 2rem;
-        border-top: 1px solid var(--border);
-        box-shadow: 0 -4px 20px rgba(0,0,0,0.08);
-        z-index: 999;
-        backdrop-filter: blur(10px);
-    }}
-    
-    .stChatInput textarea {{
-        border-radius: 50px !important;
-        border: 2px solid var(--border) !important;
-        padding: 1rem 1.5rem !important;
-        background: var(--bg-secondary) !important;
-        color: var(--text) !important;
-        font-size: 0.95rem !important;
-        transition: all 0.2s !important;
-    }}
-    
-    .stChatInput textarea:focus {{
-        border-color: var(--primary) !important;
-        box-shadow: 0 0 0 3px rgba(8, 145, 178, 0.1) !important;
-    }}
-    
-    .stChatInput textarea::placeholder {{
-        color: var(--text-secondary) !important;
-    }}
-    
-    /* ============= SIDEBAR ============= */
-    [data-testid="stSidebar"] {{
-        background: var(--bg-secondary);
-        border-right: 1px solid var(--border);
-        width: 21rem;
-    }}
-    
-    [data-testid="stSidebar"] .sidebar-content {{
-        padding: 1.5rem;
-    }}
-    
-    [data-testid="stSidebar"] h2 {{
-        color: var(--primary) !important;
-        font-weight: 800 !important;
-        font-size: 1.5rem !important;
-        margin-bottom: 0.5rem !important;
-    }}
-    
-    /* Sidebar buttons */
-    [data-testid="stSidebar"] .stButton button {{
-        width: 100%;
-        border-radius: 12px;
-        padding: 0.875rem 1rem;
-        margin-bottom: 0.5rem;
-        border: 2px solid var(--border);
-        background: var(--bg);
-        color: var(--text);
-        text-align: left;
-        font-weight: 500;
-        transition: all 0.2s;
-    }}
-    
-    [data-testid="stSidebar"] .stButton button:hover {{
-        border-color: var(--primary);
-        transform: translateX(4px);
-        box-shadow: var(--shadow);
-    }}
-    
-    /* Clear button */
-    [data-testid="stSidebar"] .stButton button[kind="primary"] {{
-        background: var(--danger);
-        color: white;
-        border: none;
-        font-weight: 600;
-    }}
-    
-    [data-testid="stSidebar"] .stButton button[kind="primary"]:hover {{
-        background: #dc2626;
-        transform: scale(1.02);
-    }}
-    
-    /* ============= TABS ============= */
-    .stTabs [data-baseweb="tab-list"] {{
-        gap: 0.25rem;
-        background: var(--bg-tertiary);
-        border-radius: 12px;
-        padding: 0.25rem;
-    }}
-    
-    .stTabs [data-baseweb="tab"] {{
-        border-radius: 8px;
-        padding: 0.75rem 1.25rem;
-        color: var(--text-secondary);
-        font-weight: 600;
-        transition: all 0.2s;
-    }}
-    
-    .stTabs [aria-selected="true"] {{
-        background: var(--primary);
-        color: white;
-    }}
-    
-    /* ============= SUGGESTION CARDS ============= */
-    .suggestion-grid {{
-        display: grid;
-        grid-template-columns: repeat(auto-fit, minmax(280px, 1fr));
-        gap: 1rem;
-        margin: 2rem 0;
-    }}
-    
-    .main .stButton button {{
-        background: var(--bg-secondary);
-        border: 2px solid var(--border);
-        border-radius: 16px;
-        padding: 1.5rem;
-        color: var(--text);
-        text-align: left;
-        min-height: 100px;
-        transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-        font-weight: 500;
-        line-height: 1.5;
-    }}
-    
-    .main .stButton button:hover {{
-        border-color: var(--primary);
-        transform: translateY(-4px);
-        box-shadow: var(--shadow-lg);
-        background: var(--primary);
-        color: white;
-    }}
-    
-    /* Refresh button */
-    .main .stButton button[kind="secondary"] {{
-        min-height: auto;
-        color: var(--primary);
-        font-weight: 600;
-        border-color: var(--primary);
-    }}
-    
-    .main .stButton button[kind="secondary"]:hover {{
-        background: var(--primary);
-        color: white;
-    }}
-    
-    /* ============= ANIMATIONS ============= */
-    @keyframes fadeInDown {{
-        from {{ opacity: 0; transform: translateY(-20px); }}
-        to {{ opacity: 1; transform: translateY(0); }}
-    }}
-    
-    @keyframes fadeInUp {{
-        from {{ opacity: 0; transform: translateY(20px); }}
-        to {{ opacity: 1; transform: translateY(0); }}
-    }}
-    
-    /* ============= RESPONSIVE ============= */
-    @media (max-width: 768px) {{
-        .main .block-container {{
-            padding: 1rem 1rem 6rem;
-        }}
-        
-        .stChatInput {{
-            left: 0;
-            padding: 1rem;
-        }}
-        
-        .app-header h1 {{
-            font-size: 2.25rem;
-        }}
-        
-        .suggestion-grid {{
-            grid-template-columns: 1fr;
-        }}
-    }}
-    </style>
-    """, unsafe_allow_html=True)
+    st.markdown(_css_html(), unsafe_allow_html=True)
 
-def render_header():
-    """Render application header"""
-    st.markdown("""
+# Header markup depends only on config constants, so interpolate it once
+_HEADER_HTML = f"""
         <div class="app-header">
-            <h1>{icon} {name}</h1>
+            <h1>{config.APP_ICON} {config.APP_NAME}</h1>
             <p class="app-subtitle">Your Intelligent Nepali Assistant</p>
             <div class="lang-badges">
                 <div class="lang-badge">🇬🇧 English</div>
@@ -932,20 +1259,25 @@ def render_header():
                 <div class="lang-badge">🌐 Nepglish</div>
             </div>
         </div>
-    """.format(icon=config.APP_ICON, name=config.APP_NAME), unsafe_allow_html=True)
+    """
 
-def render_sidebar():
-    """Render sidebar with navigation and controls"""
-    with st.sidebar:
-        st.markdown("""
+_SIDEBAR_HEADER_HTML = f"""
             <div style="text-align: center; padding: 1rem 0 1.5rem;">
-                <h2>{icon} {name}</h2>
+                <h2>{config.APP_ICON} {config.APP_NAME}</h2>
                 <p style="color: var(--text-secondary); font-size: 0.9rem; margin: 0.5rem 0 0;">
-                    v{version} - Professional Assistant
+                    v{config.VERSION} - Professional Assistant
                 </p>
             </div>
-        """.format(icon=config.APP_ICON, name=config.APP_NAME, version=config.VERSION), 
-        unsafe_allow_html=True)
+        """
+
+def render_header():
+    """Render application header"""
+    st.markdown(_HEADER_HTML, unsafe_allow_html=True)
+
+def render_sidebar():
+    """Render sidebar with navigation and controls"""
+    with st.sidebar:
+        st.markdown(_SIDEBAR_HEADER_HTML, unsafe_allow_html=True)
         
         # Tabs for different sections
         tab1, tab2, tab3 = st.tabs(["📝 Recent", "❓ FAQ", "ℹ️ Info"])
@@ -961,49 +1293,45 @@ def render_sidebar():
         
         # Clear chat button
         st.divider()
-        if st.button("🗑️ Clear All Chats", use_container_width=True, type="primary"):
-            SessionStateManager.clear_chat()
-            st.success("✅ Chat cleared!")
-            time.sleep(0.5)
-            st.rerun()
+        st.button("🗑️ Clear All Chats", use_container_width=True, type="primary",
+                  on_click=_clear_chat_with_toast)
         
         st.caption("Made with ❤️ for Nepali users")
 
+def _clear_chat_with_toast():
+    """Button callback: clear before the rerun the click triggers"""
+    SessionStateManager.clear_chat()
+    st.toast("✅ Chat cleared!")
+
 def render_history_tab():
     """Render recent queries tab"""
     history = st.session_state.query_history
     if history:
         st.markdown("**Recent Questions**")
-        for i, query in enumerate(history):
-            display_query = query[:45] + "..." if len(query) > 45 else query
-            if st.button(display_query, key=f"history_{i}", use_container_width=True):
-                process_user_message(query)
-                st.rerun()
+        labels = st.session_state.query_history_labels
+        for i, (query, display_query) in enumerate(zip(history, labels)):
+            st.button(display_query, key=f"history_{i}", use_container_width=True,
+                      on_click=SessionStateManager.queue_prompt, args=(query,))
     else:
         st.info("📭 No recent queries")
 
+# Quick-question buttons: the English FAQ questions, in FAQ order
+_FAQS: Tuple[str, ...] = tuple(FAQHandler.FAQ_DATA['en'])
+
 def render_faq_tab():
     """Render quick FAQ buttons"""
     st.markdown("**Quick Questions**")
-    faqs = [
-        "What is Kancha AI?",
-        "SEE exam information",
-        "Dashain festival",
-        "IOE entrance guide",
-        "Study tips",
-        "Career guidance"
-    ]
-    for label in faqs:
-        if st.button(label, key=f"faq_{label}", use_container_width=True):
-            process_user_message(label)
-            st.rerun()
+    for label in _FAQS:
+        st.button(label, key=f"faq_{label}", use_container_width=True,
+                  on_click=SessionStateManager.queue_prompt, args=(label,))
 
 def render_info_tab():
     """Render info and stats tab"""
     st.markdown("**📊 Usage Stats**")
     
     # Show rate limit progress
-    remaining = st.session_state.rate_limiter.get_remaining_calls()
+    limiter = st.session_state.rate_limiter
+    remaining = limiter.get_remaining_calls() if limiter else config.API_CALLS_PER_MINUTE
     progress = remaining / config.API_CALLS_PER_MINUTE
     st.progress(progress, text=f"{remaining}/{config.API_CALLS_PER_MINUTE} requests left")
     st.caption("⏱️ Resets every minute")
@@ -1011,8 +1339,8 @@ def render_info_tab():
     st.divider()
     
     # Message count
-    msg_count = len([m for m in st.session_state.messages if m["role"] == "user"])
-    st.metric("Messages Sent", msg_count)
+    st.metric("Messages Sent", st.session_state.user_msg_count)
+    st.metric("Cached Replies", st.session_state.cache_hits)
     
     st.divider()
     
@@ -1032,9 +1360,6 @@ def render_info_tab():
 
 def render_suggestions():
     """Render suggestion cards when chat is empty"""
-    if not st.session_state.suggestions:
-        SessionStateManager.generate_suggestions()
-    
     if not st.session_state.messages:
         st.markdown("""
             <div style="text-align: center; margin: 2.5rem 0 2rem;">
@@ -1051,25 +1376,40 @@ def render_suggestions():
         cols = st.columns(2, gap="medium")
         for idx, suggestion in enumerate(st.session_state.suggestions):
             with cols[idx % 2]:
-                if st.button(suggestion, key=f"sug_{idx}", use_container_width=True):
-                    process_user_message(suggestion)
-                    st.rerun()
+                st.button(suggestion, key=f"sug_{idx}", use_container_width=True,
+                          on_click=SessionStateManager.queue_prompt, args=(suggestion,))
         
         # Refresh button
         st.markdown("<br>", unsafe_allow_html=True)
         col1, col2, col3 = st.columns([1, 2, 1])
         with col2:
-            if st.button("🔄 Show different suggestions", 
-                        use_container_width=True, 
-                        type="secondary"):
-                SessionStateManager.generate_suggestions()
-                st.rerun()
+            st.button("🔄 Show different suggestions", 
+                      use_container_width=True, 
+                      type="secondary",
+                      on_click=SessionStateManager.generate_suggestions)
+
+def render_message(message: Dict[str, str]):
+    """Render a single chat message"""
+    with st.chat_message(message["role"]):
+        st.markdown(message["content"])
 
 def render_chat_messages():
-    """Render all chat messages"""
-    for message in st.session_state.messages:
-        with st.chat_message(message["role"]):
-            st.markdown(message["content"])
+    """Render recent chat messages, with older ones shown on demand"""
+    messages = st.session_state.messages
+    window = config.MAX_RENDERED_MESSAGES
+    older, recent = messages[:-window], messages[-window:]
+    
+    # Expander bodies execute even when collapsed, so gate older
+    # messages behind a toggle and only render them on request.
+    # The label stays fixed so the widget keeps its identity as messages arrive
+    if older:
+        st.caption(f"{len(older)} earlier messages hidden")
+        if st.toggle("Show earlier messages", key="show_older_messages"):
+            for message in older:
+                render_message(message)
+    
+    for message in recent:
+        render_message(message)
 
 # ============================================================================
 # MAIN APPLICATION
@@ -1093,10 +1433,11 @@ def main():
     inject_custom_css()
     
     # Load API key
-    load_dotenv()
-    api_key = st.secrets.get("GEMINI_API_KEY") or os.getenv("GEMINI_API_KEY")
+    api_key = _get_api_key()
     
     if not api_key:
+        # Don't memoize a missing key so adding one only needs a rerun
+        _get_api_key.clear()
         st.error("""
         ## 🔑 API Key Required
         
@@ -1112,28 +1453,35 @@ def main():
         """)
         st.stop()
     
-    # Initialize chat manager
-    if not st.session_state.chat_manager:
+    # Initialize chat manager (once per session; the model is shared)
+    if st.session_state.chat_manager is None:
         st.session_state.chat_manager = AIChatManager(api_key)
         st.session_state.chat_manager.start_chat()
     
     # Render UI components
     render_header()
-    render_sidebar()
+    
+    # Prompt queued by a button callback
+    if pending_prompt := st.session_state.pop("pending_prompt", None):
+        process_user_message(pending_prompt)
+    
+    # Chat input (pinned to the bottom wherever it is called)
+    prompt = st.chat_input("Type your question... (English, नेपाली, or Nepglish)")
     
     # Show suggestions or chat messages
-    if st.session_state.messages:
+    if st.session_state.messages or prompt:
         st.markdown("---")
         render_chat_messages()
     else:
         render_suggestions()
     
-    # Chat input
-    st.markdown("<div style='height: 100px;'></div>", unsafe_allow_html=True)
+    # The new turn is drawn below the history as it arrives, so no rerun
+    # is needed afterwards
+    if prompt:
+        process_user_message(prompt, stream=True)
     
-    if prompt := st.chat_input("Type your question... (English, नेपाली, or Nepglish)"):
-        process_user_message(prompt)
-        st.rerun()
+    # Sidebar last so history and stats include this run's message
+    render_sidebar()
 
 # ============================================================================
 # RUN APPLICATION
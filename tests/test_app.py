@@ -0,0 +1,152 @@
+"""
+Regression tests for app.py helpers that run without a Streamlit server
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="module")
+def app(tmp_path_factory):
+    """Import app from a scratch directory so its log file stays out of the repo"""
+    pytest.importorskip("streamlit")
+    pytest.importorskip("dotenv")
+
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("run"))
+    try:
+        import app as module
+    finally:
+        os.chdir(cwd)
+    return module
+
+# ============================================================================
+# FAKE GEMINI CHAT
+# ============================================================================
+
+class FakePart:
+    def __init__(self, text):
+        self.text = text
+
+class FakeContent:
+    def __init__(self, role, parts):
+        self.role = role
+        self.parts = [FakePart(p) if isinstance(p, str) else p for p in parts]
+
+class FakeChat:
+    """Mimics ChatSession, including the broken state after a failed stream"""
+
+    def __init__(self, model, history):
+        self.model = model
+        self._history = [
+            c if isinstance(c, FakeContent) else FakeContent(c["role"], c["parts"])
+            for c in history
+        ]
+        self._broken = False
+
+    @property
+    def history(self):
+        if self._broken:
+            raise RuntimeError("BrokenResponseError: stream did not complete")
+        return self._history
+
+    def rewind(self):
+        self._broken = False
+        return self._history.pop(), self._history.pop()
+
+    def send_message(self, message, stream=False, **kwargs):
+        self.history  # a broken session refuses new turns too
+        reply = f"reply to {message}"
+        self._history += [FakeContent("user", [message]), FakeContent("model", [reply])]
+        if not stream:
+            return FakePart(reply)
+        return self._stream(reply)
+
+    def _stream(self, reply):
+        yield FakePart(reply[:5])
+        if self.model.fail_next_stream:
+            self.model.fail_next_stream = False
+            self._broken = True
+            raise RuntimeError("stream interrupted")
+        yield FakePart(reply[5:])
+
+class FakeModel:
+    def __init__(self):
+        self.fail_next_stream = False
+
+    def start_chat(self, history=()):
+        return FakeChat(self, list(history))
+
+@pytest.fixture
+def chat_manager(app, monkeypatch):
+    model = FakeModel()
+    monkeypatch.setattr(app, "_get_model", lambda *args: model)
+    manager = app.AIChatManager("test-key")
+    manager.start_chat()
+    return manager
+
+# ============================================================================
+# AI CHAT MANAGER
+# ============================================================================
+
+def test_failed_stream_keeps_chat_usable(chat_manager):
+    assert ''.join(chat_manager.stream_message("first")) == "reply to first"
+
+    chat_manager.model.fail_next_stream = True
+    with pytest.raises(Exception, match="Failed to get AI response"):
+        ''.join(chat_manager.stream_message("second"))
+
+    # The failed turn is dropped and the next message goes through
+    assert len(chat_manager.chat.history) == 2
+    assert ''.join(chat_manager.stream_message("third")) == "reply to third"
+    assert [c.parts[0].text for c in chat_manager.chat.history] == [
+        "first", "reply to first", "third", "reply to third"
+    ]
+
+def test_history_key_recovers_from_broken_session(chat_manager):
+    ''.join(chat_manager.stream_message("first"))
+    key = chat_manager.history_key()
+
+    # Simulate a session left broken by an interrupted stream
+    chat_manager.chat.send_message("second")
+    chat_manager.chat._broken = True
+
+    assert chat_manager.history_key() == key
+    assert len(chat_manager.chat.history) == 2
+
+def test_history_key_ignores_non_text_parts(chat_manager):
+    plain = chat_manager.history_key()
+    chat_manager.chat = chat_manager.model.start_chat(history=[
+        FakeContent("user", ["look at this", object()]),
+        FakeContent("model", ["nice picture"]),
+    ])
+    key = chat_manager.history_key()
+    assert key and key != plain
+
+# ============================================================================
+# FAQ HANDLER
+# ============================================================================
+
+def test_faq_matches_query_inside_question(app):
+    assert app.FAQHandler.get_answer("kancha", 'en') is not None
+
+def test_faq_query_cannot_span_two_questions(app):
+    questions = [q.lower() for q in app.FAQHandler.FAQ_DATA['en']]
+    spanning = questions[0][-3:] + "\x00" + questions[1][:3]
+    assert app.FAQHandler.get_answer(spanning, 'en') is None
+
+# ============================================================================
+# RESPONSE PROCESSOR
+# ============================================================================
+
+def test_url_in_markdown_link_keeps_closing_paren(app):
+    cleaned = app.ResponseProcessor.clean("Watch [video](https://youtu.be/x) now")
+    assert cleaned == "Watch [video](🔍 YouTube video search gara: ) now"
+
+def test_url_in_parentheses_keeps_trailing_punctuation(app):
+    cleaned = app.ResponseProcessor.clean("See (https://example.com/page), then ask")
+    assert cleaned == "See (🔗 [Link removed - Search instead]), then ask"
@@ -8,6 +8,9 @@ from datetime import datetime
 import time
 from urllib.parse import quote_plus, urlencode
 import html
+import logging
+
+logger = logging.getLogger(__name__)
 
 class WebSearcher:
     """Enhanced web search optimized for Nepal-specific queries"""
@@ -21,7 +24,7 @@ class WebSearcher:
     def search(self, query, max_results=3):
         """Search with Nepal-specific optimization"""
         try:
-            print(f"\n🔍 Searching: '{query}'")
+            logger.debug("Searching: %r", query)
             
             # Special handling for political positions
             if self._is_political_query(query):
@@ -31,7 +34,7 @@ class WebSearcher:
             return self._enhanced_search(query, max_results)
             
         except Exception as e:
-            print(f"Search error: {e}")
+            logger.warning("Search error: %s", e)
             return []
     
     def _is_political_query(self, query):
@@ -70,14 +73,14 @@ class WebSearcher:
             for search_query in search_queries:
                 results = self._duckduckgo_search(search_query, max_results, is_political=True)
                 if results:
-                    print(f"Found political results using: '{search_query}'")
+                    logger.debug("Found political results using: %r", search_query)
                     return results
             
             # Fallback to news sites
             return self._search_nepal_news(query, max_results)
             
         except Exception as e:
-            print(f"Political search error: {e}")
+            logger.warning("Political search error: %s", e)
             return []
     
     def _enhanced_search(self, query, max_results):
@@ -96,7 +99,7 @@ class WebSearcher:
             return []
             
         except Exception as e:
-            print(f"Enhanced search error: {e}")
+            logger.warning("Enhanced search error: %s", e)
             return []
     
     def _duckduckgo_search(self, query, max_results, is_political=False):
@@ -111,7 +114,7 @@ class WebSearcher:
                 current_year = datetime.now().year
                 enhanced_query = f"{query} {current_year} Nepal"
             
-            print(f"DuckDuckGo query: '{enhanced_query}'")
+            logger.debug("DuckDuckGo query: %r", enhanced_query)
             
             # Prepare request
             params = {
@@ -134,13 +137,13 @@ class WebSearcher:
             response = requests.get(url, headers=headers, timeout=15)
             
             if response.status_code != 200:
-                print(f"DuckDuckGo returned status: {response.status_code}")
+                logger.warning("DuckDuckGo returned status: %s", response.status_code)
                 return []
             
             return self._parse_duckduckgo_results(response.text, max_results)
             
         except Exception as e:
-            print(f"DuckDuckGo search error: {e}")
+            logger.warning("DuckDuckGo search error: %s", e)
             return []
     
     def _parse_duckduckgo_results(self, html_content, max_results):
@@ -183,11 +186,11 @@ class WebSearcher:
                         'url_hint': url[:50] + "..." if len(url) > 50 else url
                     })
             
-            print(f"Parsed {len(results)} results from DuckDuckGo")
+            logger.debug("Parsed %d results from DuckDuckGo", len(results))
             return results
             
         except Exception as e:
-            print(f"Parse error: {e}")
+            logger.warning("Parse error: %s", e)
             return []
     
     def _is_irrelevant(self, title, snippet):
@@ -230,7 +233,7 @@ class WebSearcher:
             return results[:max_results]
             
         except Exception as e:
-            print(f"News search error: {e}")
+            logger.warning("News search error: %s", e)
             return []
     
     def _search_onlinekhabar(self, query):
@@ -265,7 +268,7 @@ class WebSearcher:
                 return results
                 
         except Exception as e:
-            print(f"OnlineKhabar search error: {e}")
+            logger.warning("OnlineKhabar search error: %s", e)
         
         return []
     
@@ -309,7 +312,7 @@ class WebSearcher:
                 return results
                 
         except Exception as e:
-            print(f"Ekantipur search error: {e}")
+            logger.warning("Ekantipur search error: %s", e)
         
         return []
     
@@ -345,7 +348,7 @@ class WebSearcher:
                 return results
                 
         except Exception as e:
-            print(f"Setopati search error: {e}")
+            logger.warning("Setopati search error: %s", e)
         
         return []
     
@@ -394,7 +397,7 @@ class WebSearcher:
                 return results
                 
         except Exception as e:
-            print(f"Google search error: {e}")
+            logger.warning("Google search error: %s", e)
         
         return []
     
@@ -424,9 +427,7 @@ web_searcher = WebSearcher()
 def get_search_context(query):
     """Get formatted search context with Nepal focus"""
     try:
-        print(f"\n{'='*60}")
-        print(f"🔍 SEARCHING: '{query}'")
-        print(f"{'='*60}")
+        logger.info("Searching: %r", query)
         
         start_time = time.time()
         
@@ -436,10 +437,10 @@ def get_search_context(query):
         search_time = time.time() - start_time
         
         if not results:
-            print(f"❌ No search results found ({search_time:.2f}s)")
+            logger.info("No search results found (%.2fs)", search_time)
             return None
         
-        print(f"✅ Found {len(results)} results in {search_time:.2f}s")
+        logger.info("Found %d results in %.2fs", len(results), search_time)
         
         # Format context
         current_date = datetime.now().strftime("%B %d, %Y %H:%M")
@@ -473,7 +474,7 @@ def get_search_context(query):
         return context
         
     except Exception as e:
-        print(f"Error getting search context: {e}")
+        logger.warning("Error getting search context: %s", e)
         return None
 
 def needs_web_search(prompt):